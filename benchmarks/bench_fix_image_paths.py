@@ -0,0 +1,128 @@
+"""fix_image_paths 벤치마크 - 입력 길이에 대해 처리 시간이 선형인지 확인
+
+사용법:
+    python benchmarks/bench_fix_image_paths.py [--legacy] [--check]
+
+세 가지 입력을 크기를 두 배씩 늘려가며 측정합니다.
+  - images:   인라인 이미지가 수천 개인 노트
+  - long-tag: 속성 하나가 수 MB인 img 태그
+  - unclosed: '>'로 닫히지 않은 <img 가 반복되는 노트
+--legacy를 주면 이전 정규식 구현도 함께 측정합니다 (unclosed 입력에서 제곱 시간).
+--check를 주면 문자당 처리 시간이 크기에 따라 늘어날 때 종료 코드 1을 반환합니다.
+"""
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from nsx_engine import fix_image_paths  # noqa: E402
+
+
+# 가장 큰 입력과 가장 작은 입력의 문자당 처리 시간 비율 허용치
+LINEAR_TOLERANCE = 3.0
+
+
+def legacy_fix_image_paths(html_content, attachments=None):
+    """이전 구현 (태그마다 정규식을 다시 실행)"""
+    if not attachments:
+        return html_content
+
+    ref_to_filename = {}
+    for att_info in attachments.values():
+        ref = att_info.get('ref', '')
+        name = att_info.get('name', '')
+        if ref and name:
+            ref_to_filename[ref] = name
+
+    def replace_img(match):
+        full_tag = match.group(0)
+        ref_match = re.search(r'ref="([^"]+)"', full_tag)
+        if ref_match and ref_match.group(1) in ref_to_filename:
+            new_src = f'webman/3rdparty/NoteStation/images/{ref_to_filename[ref_match.group(1)]}'
+            full_tag = re.sub(r'src="[^"]*"', f'src="{new_src}"', full_tag)
+        return full_tag
+
+    return re.sub(r'<img[^>]*>', replace_img, html_content)
+
+
+def make_images_note(count):
+    """인라인 이미지 count개짜리 노트"""
+    attachments = {}
+    tags = []
+    for i in range(count):
+        ref = f"ref{i:06d}"
+        attachments[f"_{i}"] = {'ref': ref, 'name': f"image{i}.png", 'type': 'image/png'}
+        tags.append(f'<p>문단 {i}<img class="syno-notestation-image-object" '
+                    f'src="webman/3rdparty/NoteStation/images/transparent.gif" '
+                    f'ref="{ref}" width="640" height="480"></p>')
+    return ''.join(tags), attachments
+
+
+def make_long_tag_note(megabytes):
+    """속성 값 하나가 megabytes MB인 img 태그"""
+    attachments = {'_0': {'ref': 'ref0', 'name': 'image0.png', 'type': 'image/png'}}
+    alt = 'x' * (megabytes * 1024 * 1024)
+    return f'<img src="old.gif" alt="{alt}" ref="ref0">', attachments
+
+
+def make_unclosed_note(count):
+    """'>'로 닫히지 않은 <img 가 count개 반복되는 노트"""
+    attachments = {'_0': {'ref': 'ref0', 'name': 'image0.png', 'type': 'image/png'}}
+    return ('<img src="a" ' + 'y' * 200) * count, attachments
+
+
+CASES = [
+    ('images', make_images_note, [1000, 2000, 4000, 8000]),
+    ('long-tag', make_long_tag_note, [1, 2, 4, 8]),
+    ('unclosed', make_unclosed_note, [250, 500, 1000, 2000]),
+]
+
+
+def measure(func, html, attachments, repeat=3):
+    """가장 빠른 실행 시간 (초)"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(html, attachments)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="fix_image_paths 선형성 벤치마크")
+    parser.add_argument("--legacy", action="store_true", help="이전 정규식 구현도 측정")
+    parser.add_argument("--check", action="store_true",
+                        help="선형이 아니면 종료 코드 1 반환")
+    args = parser.parse_args(argv)
+
+    implementations = [('current', fix_image_paths)]
+    if args.legacy:
+        implementations.append(('legacy', legacy_fix_image_paths))
+
+    failed = False
+    print(f"{'case':<10} {'impl':<8} {'size':>6} {'chars':>11} {'ms':>10} {'ns/char':>9}")
+    for case_name, make_note, sizes in CASES:
+        for impl_name, func in implementations:
+            per_char = []
+            for size in sizes:
+                html, attachments = make_note(size)
+                elapsed = measure(func, html, attachments)
+                per_char.append(elapsed / len(html))
+                print(f"{case_name:<10} {impl_name:<8} {size:>6} {len(html):>11,} "
+                      f"{elapsed * 1000:>10.2f} {per_char[-1] * 1e9:>9.2f}")
+
+            ratio = per_char[-1] / per_char[0]
+            verdict = "선형" if ratio <= LINEAR_TOLERANCE else "비선형"
+            print(f"{'':<10} {impl_name:<8} 문자당 시간 비율 (최대/최소): {ratio:.2f} → {verdict}\n")
+            if impl_name == 'current' and ratio > LINEAR_TOLERANCE:
+                failed = True
+
+    return 1 if args.check and failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,13 @@
-import os
-import json
+import argparse
+import sys
 import zipfile
-import shutil
 from pathlib import Path
-import tempfile
-import re
+
+from nsx_engine import (
+    DEFAULT_IMAGE_WORKERS, DEFAULT_MAX_INFLIGHT_BYTES, LINK_MODES,
+    ConversionEngine, fix_image_paths, sanitize_filename,
+)
+
 # colorama 초기화 (Windows 색상 지원)
 try:
     from colorama import init, Fore, Style
@@ -38,63 +41,6 @@ def print_header():
     print("="*60 + "\n")
 
 
-def sanitize_filename(name: str) -> str:
-    """파일 이름으로 쓸 수 없는 문자 제거"""
-    invalid = r'\/:*?"<>|'
-    for ch in invalid:
-        name = name.replace(ch, "_")
-    return name.strip() or "untitled"
-
-
-def fix_image_paths(html_content, attachments=None):
-    """HTML 내의 이미지 경로를 실제 파일명으로 수정"""
-    if not attachments:
-        return html_content
-    
-    # ref -> 파일명 매핑 생성
-    ref_to_filename = {}
-    for att_id, att_info in attachments.items():
-        # 이미지 파일 확인 - type 필드 또는 파일 확장자로 확인
-        att_type = att_info.get('type', '').lower()
-        att_name = att_info.get('name', '').lower()
-        
-        # image/ 로 시작하는 타입이거나, 이미지 확장자를 가진 경우
-        is_image = (att_type.startswith('image/') or 
-                   att_name.endswith(('.png', '.jpg', '.jpeg', '.gif', '.bmp', '.webp', '.svg')))
-        
-        if is_image:
-            ref = att_info.get('ref', '')
-            name = att_info.get('name', '')
-            if ref and name:
-                ref_to_filename[ref] = name
-    
-    # ref 속성이 있는 img 태그를 찾아서 src 수정
-    def replace_img(match):
-        full_tag = match.group(0)
-        
-        # ref 속성 찾기
-        ref_match = re.search(r'ref="([^"]+)"', full_tag)
-        if ref_match:
-            ref_value = ref_match.group(1)
-            if ref_value in ref_to_filename:
-                # src를 실제 이미지 경로로 교체
-                filename = ref_to_filename[ref_value]
-                new_src = f'webman/3rdparty/NoteStation/images/{filename}'
-                # src 속성 교체
-                full_tag = re.sub(
-                    r'src="[^"]*"',
-                    f'src="{new_src}"',
-                    full_tag
-                )
-        
-        return full_tag
-    
-    # img 태그 전체를 찾아서 교체
-    html_content = re.sub(r'<img[^>]*>', replace_img, html_content)
-    
-    return html_content
-
-
 def get_file_path(prompt, must_exist=True):
     """파일 경로 입력 받기"""
     while True:
@@ -114,175 +60,42 @@ def get_file_path(prompt, must_exist=True):
         return path_obj
 
 
-def convert_nsx(nsx_path, output_path):
+def convert_nsx(nsx_path, output_path, workers=1,
+                image_workers=DEFAULT_IMAGE_WORKERS,
+                max_inflight_bytes=DEFAULT_MAX_INFLIGHT_BYTES, link_mode='auto',
+                force=False, resume=False):
     """NSX 파일을 HTML로 변환"""
-    temp_dir = None
+    level_colors = {
+        "info": Fore.CYAN,
+        "success": Fore.GREEN,
+        "warning": Fore.YELLOW,
+        "error": Fore.RED,
+    }
+    
+    def log(msg, level="info"):
+        print_color(msg, level_colors.get(level))
     
     try:
         print_color("\n🚀 변환 시작...", Fore.GREEN)
         print(f"📂 NSX 파일: {nsx_path}")
         
-        # 출력 폴더 생성
-        output_dir = Path(output_path)
-        output_dir.mkdir(parents=True, exist_ok=True)
-        print(f"📁 출력 폴더: {output_dir.resolve()}\n")
-        
-        # 임시 폴더에 압축 해제
-        temp_dir = Path(tempfile.mkdtemp())
-        print_color("📦 NSX 파일 압축 해제 중...", Fore.CYAN)
-        
-        with zipfile.ZipFile(nsx_path, 'r') as zip_ref:
-            zip_ref.extractall(temp_dir)
-            
-        print_color("✅ 압축 해제 완료\n", Fore.GREEN)
-        
-        # 이미지 폴더 구조 생성
-        images_dir = output_dir / "webman" / "3rdparty" / "NoteStation" / "images"
-        images_dir.mkdir(parents=True, exist_ok=True)
-        
-        # 이미지-md5 매핑 수집 (같은 MD5에 여러 파일명 지원)
-        image_mapping = {}  # {md5: [names]}
-        image_count = 0
-        
-        print_color("🖼️  이미지 정보 수집 중...", Fore.CYAN)
-        
-        # 모든 노트 파일에서 attachment 정보 수집
-        for folder, _, files in os.walk(temp_dir):
-            for file in files:
-                file_path = Path(folder) / file
-                # 확장자 없는 파일만 확인 (file_로 시작하는 것 제외)
-                if file_path.suffix == "" and not file_path.name.startswith('file_'):
-                    try:
-                        text = file_path.read_text(encoding="utf-8", errors="ignore")
-                        # JSON 파일인지 확인
-                        if not text.strip().startswith('{'):
-                            continue
-                        
-                        data = json.loads(text)
-                        # category가 note인 것만 처리
-                        if data.get('category') != 'note':
-                            continue
-                        
-                        attachments = data.get("attachment", {})
-                        if not attachments:
-                            continue
-                        
-                        for att_id, att_info in attachments.items():
-                            # 이미지 파일 확인 - type 필드 또는 파일 확장자로 확인
-                            att_type = att_info.get('type', '').lower()
-                            att_name = att_info.get('name', '').lower()
-                            
-                            # image/ 로 시작하는 타입이거나, 이미지 확장자를 가진 경우
-                            is_image = (att_type.startswith('image/') or 
-                                       att_name.endswith(('.png', '.jpg', '.jpeg', '.gif', '.bmp', '.webp', '.svg')))
-                            
-                            if is_image:
-                                md5 = att_info.get('md5')
-                                name = att_info.get('name', 'unknown')
-                                if md5 and name:
-                                    if md5 not in image_mapping:
-                                        image_mapping[md5] = []
-                                    # 중복 방지
-                                    if name not in image_mapping[md5]:
-                                        image_mapping[md5].append(name)
-                    except:
-                        continue
-        
-        total_images = sum(len(names) for names in image_mapping.values())
-        print_color(f"📊 {total_images}개의 이미지 정보 수집 완료 (고유 MD5: {len(image_mapping)}개)", Fore.GREEN)
-        
-        # file_<md5> 파일들을 모든 이미지 이름으로 복사
-        print_color("📁 이미지 파일 복사 중...", Fore.CYAN)
-        for folder, _, files in os.walk(temp_dir):
-            for file in files:
-                if file.startswith('file_'):
-                    md5_hash = file.replace('file_', '')
-                    if md5_hash in image_mapping:
-                        source_file = Path(folder) / file
-                        
-                        # 같은 MD5를 가진 모든 파일명으로 복사
-                        for name in image_mapping[md5_hash]:
-                            target_file = images_dir / name
-                            
-                            try:
-                                shutil.copy2(source_file, target_file)
-                                image_count += 1
-                            except Exception as e:
-                                print_color(f"⚠️  이미지 복사 실패: {name}", Fore.YELLOW)
-        
-        if image_count > 0:
-            print_color(f"✅ {image_count}개 이미지 파일 복사 완료\n", Fore.GREEN)
-        else:
-            print_color("ℹ️  이미지 파일이 없습니다\n", Fore.CYAN)
-        
-        # 노트 파일 찾기 및 변환
-        note_count = 0
-        error_count = 0
-        
-        print_color("🔍 노트 파일 검색 및 변환 중...\n", Fore.CYAN)
-        
-        for folder, _, files in os.walk(temp_dir):
-            for file in files:
-                file_path = Path(folder) / file
-                
-                # 확장자 없는 파일만 확인 (file_로 시작하는 것 제외)
-                if file_path.suffix == "" and not file_path.name.startswith('file_'):
-                    try:
-                        text = file_path.read_text(encoding="utf-8", errors="ignore")
-                        
-                        # JSON 파일인지 확인
-                        if not text.strip().startswith('{'):
-                            continue
-                        
-                        data = json.loads(text)
-                        
-                        # category가 note인 것만 처리
-                        if data.get('category') != 'note':
-                            continue
-                        
-                        # JSON 형식 확인
-                        if '"content"' not in text:
-                            continue
-                        title = sanitize_filename(data.get("title", "untitled"))
-                        html_content = data.get("content", "")
-                        attachments = data.get("attachment", {})
-                        
-                        if not html_content:
-                            continue
-                        
-                        # 이미지 경로 수정 (attachment 정보 전달)
-                        html_content = fix_image_paths(html_content, attachments)
-                        
-                        # HTML 파일로 저장
-                        html_file = output_dir / f"{title}.html"
-                        
-                        # 중복 파일명 처리
-                        counter = 1
-                        while html_file.exists():
-                            html_file = output_dir / f"{title}_{counter}.html"
-                            counter += 1
-                        
-                        with open(html_file, "w", encoding="utf-8") as h:
-                            h.write(html_content)
-                        
-                        print_color(f"  ✅ {title}.html", Fore.GREEN)
-                        note_count += 1
-                            
-                    except json.JSONDecodeError:
-                        continue
-                    except Exception as e:
-                        print_color(f"  ❌ {file_path.name}: {str(e)}", Fore.RED)
-                        error_count += 1
+        result = ConversionEngine(
+            nsx_path, output_path, log, workers=workers,
+            image_workers=image_workers, max_inflight_bytes=max_inflight_bytes,
+            link_mode=link_mode, force=force, resume=resume,
+        ).run()
         
         # 결과 출력
         print("\n" + "="*60)
         print_color("✅ 변환 완료!", Fore.GREEN)
-        print(f"📊 성공: {note_count}개 노트")
-        if image_count > 0:
-            print(f"🖼️  이미지: {image_count}개 (webman 폴더에 저장)")
-        if error_count > 0:
-            print_color(f"⚠️  실패: {error_count}개", Fore.YELLOW)
-        print(f"📁 저장 위치: {output_dir.resolve()}")
+        print(f"📊 성공: {result.note_count}개 노트")
+        if result.image_count > 0:
+            print(f"🖼️  이미지: {result.image_count}개 (webman 폴더에 저장)")
+            if result.linked_count > 0:
+                print(f"🔗 링크: {result.linked_count}개 (중복 이미지)")
+        if result.error_count > 0:
+            print_color(f"⚠️  실패: {result.error_count}개", Fore.YELLOW)
+        print(f"📁 저장 위치: {result.output_dir.resolve()}")
         print("="*60)
         
         return True
@@ -293,35 +106,60 @@ def convert_nsx(nsx_path, output_path):
     except Exception as e:
         print_color(f"\n❌ 오류 발생: {str(e)}", Fore.RED)
         return False
-    finally:
-        # 임시 폴더 정리
-        if temp_dir and temp_dir.exists():
-            try:
-                shutil.rmtree(temp_dir)
-                print_color("\n🧹 임시 폴더 정리 완료", Fore.CYAN)
-            except Exception as e:
-                print_color(f"\n⚠️  임시 폴더 정리 실패: {str(e)}", Fore.YELLOW)
 
 
-def main():
-    print_header()
-    
-    # NSX 파일 경로 입력
-    nsx_file = get_file_path(
-        "📂 NSX 파일 경로를 입력하세요 (드래그 앤 드롭 가능):",
-        must_exist=True
-    )
+def parse_args(argv=None):
+    """명령줄 인자 파싱 - NSX 파일을 생략하면 대화형으로 입력 받음"""
+    parser = argparse.ArgumentParser(description="Synology Note Station(.nsx) → HTML 변환기")
+    parser.add_argument("nsx_file", nargs="?",
+                        help="변환할 NSX 파일 (생략하면 대화형으로 입력)")
+    parser.add_argument("output", nargs="?",
+                        help="출력 폴더 (기본값: converted_notes)")
+    parser.add_argument("--workers", type=int, default=1, metavar="N",
+                        help="노트 변환에 사용할 프로세스 수 (기본값: 1, 0이면 CPU 개수)")
+    parser.add_argument("--image-workers", type=int, default=DEFAULT_IMAGE_WORKERS, metavar="N",
+                        help=f"이미지 기록 스레드 수 (기본값: {DEFAULT_IMAGE_WORKERS})")
+    parser.add_argument("--max-inflight-mb", type=int,
+                        default=DEFAULT_MAX_INFLIGHT_BYTES // (1024 * 1024), metavar="MB",
+                        help="동시에 기록 중인 이미지 크기 합계 상한 (기본값: %(default)s MB)")
+    parser.add_argument("--link-mode", choices=LINK_MODES, default="auto",
+                        help="같은 이미지(MD5)의 다른 파일명을 만드는 방식 (기본값: auto)")
+    parser.add_argument("--force", action="store_true",
+                        help="이전 변환 기록과 내용이 같은 노트/이미지도 모두 다시 기록")
+    parser.add_argument("--resume", action="store_true",
+                        help="중단된 변환을 같은 출력 폴더의 체크포인트에서 이어서 진행")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    interactive = args.nsx_file is None
     
-    # 파일 확장자 확인
-    if nsx_file.suffix.lower() != ".nxs":
-        print_color("\n⚠️  경고: .nxs 파일이 아닙니다. 계속하시겠습니까? (y/n)", Fore.YELLOW)
-        if input(">> ").strip().lower() != 'y':
-            print_color("❌ 취소되었습니다.", Fore.RED)
-            return
+    print_header()
     
-    # 출력 폴더 경로 입력
-    print_color("\n📁 출력 폴더 경로를 입력하세요 (비워두면 기본값: converted_notes):", Fore.YELLOW)
-    output_path = input(">> ").strip().strip('"').strip("'")
+    if interactive:
+        # NSX 파일 경로 입력
+        nsx_file = get_file_path(
+            "📂 NSX 파일 경로를 입력하세요 (드래그 앤 드롭 가능):",
+            must_exist=True
+        )
+        
+        # 파일 확장자 확인
+        if nsx_file.suffix.lower() != ".nxs":
+            print_color("\n⚠️  경고: .nxs 파일이 아닙니다. 계속하시겠습니까? (y/n)", Fore.YELLOW)
+            if input(">> ").strip().lower() != 'y':
+                print_color("❌ 취소되었습니다.", Fore.RED)
+                return 1
+        
+        # 출력 폴더 경로 입력
+        print_color("\n📁 출력 폴더 경로를 입력하세요 (비워두면 기본값: converted_notes):", Fore.YELLOW)
+        output_path = input(">> ").strip().strip('"').strip("'")
+    else:
+        nsx_file = Path(args.nsx_file)
+        if not nsx_file.exists():
+            print_color(f"❌ 파일을 찾을 수 없습니다: {nsx_file}", Fore.RED)
+            return 1
+        output_path = args.output
     
     if not output_path:
         output_path = Path.cwd() / "converted_notes"
@@ -329,21 +167,29 @@ def main():
         output_path = Path(output_path)
     
     # 변환 시작
-    success = convert_nsx(nsx_file, output_path)
+    success = convert_nsx(
+        nsx_file, output_path, workers=args.workers,
+        image_workers=args.image_workers,
+        max_inflight_bytes=args.max_inflight_mb * 1024 * 1024,
+        link_mode=args.link_mode, force=args.force, resume=args.resume,
+    )
     
     if success:
         print_color("\n✨ 모든 작업이 완료되었습니다!", Fore.GREEN)
     else:
         print_color("\n❌ 변환에 실패했습니다.", Fore.RED)
     
-    # 종료 대기
-    print("\n엔터 키를 누르면 종료합니다...")
-    input()
+    if interactive:
+        # 종료 대기
+        print("\n엔터 키를 누르면 종료합니다...")
+        input()
+    
+    return 0 if success else 1
 
 
 if __name__ == "__main__":
     try:
-        main()
+        sys.exit(main())
     except KeyboardInterrupt:
         print_color("\n\n❌ 사용자가 중단했습니다.", Fore.RED)
     except Exception as e:
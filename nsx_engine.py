@@ -0,0 +1,959 @@
+"""Synology Note Station(.nsx) 변환 엔진
+
+웹 GUI, 콘솔, Tkinter 세 가지 버전이 공유하는 변환 로직입니다.
+NSX 파일(zip)을 임시 폴더에 풀지 않고 아카이브에서 직접 읽어 변환합니다.
+"""
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+
+# 이미지 저장 경로 (NSX 내부 webman 폴더 구조 유지)
+IMAGES_SUBDIR = Path("webman") / "3rdparty" / "NoteStation" / "images"
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.bmp', '.webp', '.svg')
+
+# zip 멤버를 대상 파일로 스트리밍할 때 사용하는 버퍼 크기
+COPY_BUFFER_SIZE = 1024 * 1024
+
+# 이미지 기록 스레드 수와 동시에 기록 중인 blob 크기 합계의 기본 상한
+DEFAULT_IMAGE_WORKERS = 4
+DEFAULT_MAX_INFLIGHT_BYTES = 256 * 1024 * 1024
+
+# 같은 MD5를 가진 이미지 파일명을 만드는 방식 ("auto"는 앞에서부터 시도)
+LINK_MODES = ('auto', 'hardlink', 'reflink', 'symlink', 'copy')
+
+# Linux FICLONE ioctl (copy-on-write 복제)
+FICLONE = 0x40049409
+
+# 출력 폴더에 저장되는 변환 기록 (증분 변환용)
+MANIFEST_NAME = ".nsx_manifest.json"
+
+# 변환 중단 시 이어서 변환하기 위한 체크포인트 저널과 fsync 간격 (항목 수)
+JOURNAL_NAME = ".nsx_journal"
+JOURNAL_SYNC_INTERVAL = 200
+
+# 기록 중인 파일에 붙는 접미사 - 다 쓴 뒤 원래 이름으로 교체
+PART_SUFFIX = ".part"
+
+
+def sanitize_filename(name: str) -> str:
+    """파일 이름으로 쓸 수 없는 문자 제거"""
+    invalid = r'\/:*?"<>|'
+    for ch in invalid:
+        name = name.replace(ch, "_")
+    return name.strip() or "untitled"
+
+
+def is_image_attachment(att_info) -> bool:
+    """첨부 파일이 이미지인지 확인 - type 필드 또는 파일 확장자로 확인"""
+    att_type = att_info.get('type', '').lower()
+    att_name = att_info.get('name', '').lower()
+
+    # image/ 로 시작하는 타입이거나, 이미지 확장자를 가진 경우
+    return att_type.startswith('image/') or att_name.endswith(IMAGE_EXTENSIONS)
+
+
+def image_ref_map(attachments):
+    """attachment 정보에서 {ref: 이미지 파일명} 매핑 생성"""
+    ref_to_filename = {}
+    for att_info in (attachments or {}).values():
+        if is_image_attachment(att_info):
+            ref = att_info.get('ref', '')
+            name = att_info.get('name', '')
+            if ref and name:
+                ref_to_filename[ref] = name
+    return ref_to_filename
+
+
+# img 태그 토크나이저 패턴 (모듈 로드 시 한 번만 컴파일)
+_IMG_TAG_START = re.compile(r'<img(?=[\s/>])', re.IGNORECASE)
+# 속성 하나: 이름과 큰따옴표(2) / 작은따옴표(3) / 따옴표 없는(4) 값
+_IMG_ATTR = re.compile(
+    r"""[\s/]*(?:([^\s/>"'=]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]*)))?)?"""
+)
+_QUOTE_ESCAPES = {2: ('"', '&quot;'), 3: ("'", '&#39;')}
+
+
+def rewrite_image_refs(html_content, ref_to_filename):
+    """ref 속성이 매핑에 있는 img 태그의 src를 실제 이미지 경로로 교체
+
+    HTML을 앞에서부터 한 번만 훑는 토크나이저로, 큰따옴표/작은따옴표/따옴표 없는
+    속성을 모두 처리합니다. 태그가 아주 많거나 속성이 아주 긴 노트에서도 처리
+    시간이 길이에 비례합니다. 따옴표나 태그가 닫히지 않으면 나머지는 그대로 둡니다.
+    """
+    if not ref_to_filename:
+        return html_content
+
+    parts = []
+    copied = 0
+    pos = 0
+    length = len(html_content)
+    search_tag = _IMG_TAG_START.search
+    match_attr = _IMG_ATTR.match
+
+    while True:
+        tag = search_tag(html_content, pos)
+        if tag is None:
+            break
+
+        # 태그 끝('>')까지 속성을 읽으면서 첫 번째 ref와 src만 기억
+        pos = tag.end()
+        ref = src = None
+        while True:
+            attr = match_attr(html_content, pos)
+            pos = attr.end()
+            name = attr.group(1)
+            if name is None:
+                if pos >= length:
+                    pos = -1
+                    break
+                if html_content[pos] == '>':
+                    pos += 1
+                    break
+                # 이름이 될 수 없는 문자(따옴표, =)는 건너뜀
+                pos += 1
+                continue
+
+            value = attr.lastindex
+            if value == 4 and not attr.group(4) and html_content[pos:pos + 1] in ('"', "'"):
+                # 닫히지 않은 따옴표
+                pos = -1
+                break
+
+            name = name.lower()
+            if name == 'ref' and ref is None:
+                ref = attr.group(value) if value > 1 else ''
+            elif name == 'src' and src is None and value > 1:
+                src = (attr.start(value), attr.end(value), value)
+
+        if pos < 0:
+            break
+        if not ref or src is None:
+            continue
+        filename = ref_to_filename.get(ref)
+        if filename is None:
+            continue
+
+        # src를 실제 이미지 경로로 교체 (따옴표가 없던 값은 큰따옴표로 감쌈)
+        start, end, value = src
+        new_src = f'webman/3rdparty/NoteStation/images/{filename}'
+        quote, escaped = _QUOTE_ESCAPES.get(value, ('"', '&quot;'))
+        new_src = new_src.replace(quote, escaped)
+        if value == 4:
+            new_src = f'"{new_src}"'
+        parts.append(html_content[copied:start])
+        parts.append(new_src)
+        copied = end
+
+    if not parts:
+        return html_content
+    parts.append(html_content[copied:])
+    return ''.join(parts)
+
+
+def fix_image_paths(html_content, attachments=None):
+    """HTML 내의 이미지 경로를 실제 파일명으로 수정"""
+    if not attachments:
+        return html_content
+    return rewrite_image_refs(html_content, image_ref_map(attachments))
+
+
+# 프로세스 풀로 넘기는 노트 필드 (나머지 필드는 파싱 후 버림)
+NOTE_FIELDS = ('title', 'content', 'attachment')
+
+# 작업 프로세스 하나당 한 번에 넘기는 노트 수와 IPC 묶음 크기
+NOTE_BATCH_SIZE = 64
+NOTE_CHUNK_SIZE = 16
+
+
+def parse_note_bytes(raw):
+    """노트 멤버 바이트를 파싱 - 노트가 아니면 None
+
+    JSON 형식이 잘못된 경우 json.JSONDecodeError가 발생합니다.
+    """
+    text = raw.decode("utf-8", errors="ignore")
+
+    # JSON 파일인지 확인
+    if not text.strip().startswith('{'):
+        return None
+
+    data = json.loads(text)
+
+    # category가 note인 것만 처리
+    if not isinstance(data, dict) or data.get('category') != 'note':
+        return None
+
+    # JSON 형식 확인
+    if '"content"' not in text:
+        return None
+
+    return data
+
+
+def _parse_note_task(raw):
+    """노트 파싱 작업 - (필요한 필드, 내용 해시, 오류 메시지) 반환
+
+    프로세스 풀에서도 실행되므로 예외 대신 결과로 오류를 돌려줘서
+    순서가 보장되도록 합니다.
+    """
+    try:
+        data = parse_note_bytes(raw)
+    except json.JSONDecodeError:
+        return None, None, None
+    except Exception as e:
+        return None, None, str(e)
+    if data is None:
+        return None, None, None
+    fields = {key: data[key] for key in NOTE_FIELDS if key in data}
+    return fields, hashlib.sha1(raw).hexdigest(), None
+
+
+def _render_note_task(note_fields):
+    """노트 HTML 변환 작업 - (파일 제목, HTML, 오류 메시지) 반환"""
+    title, content, attachments = note_fields
+    try:
+        title = sanitize_filename(title)
+        # 이미지 경로 수정 (attachment 정보 전달)
+        return title, fix_image_paths(content, attachments), None
+    except Exception as e:
+        return None, None, str(e)
+
+
+def _map_ordered(executor, func, items):
+    """executor가 있으면 병렬로, 없으면 순차로 실행 - 결과는 항상 입력 순서"""
+    if executor is None:
+        return map(func, items)
+    return executor.map(func, items, chunksize=NOTE_CHUNK_SIZE)
+
+
+def _batched(items, size):
+    """items를 size 개씩 나눈 리스트로 반환"""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class NSXArchive:
+    """NSX(zip) 파일을 압축 해제 없이 직접 읽는 리더
+
+    중앙 디렉터리(infolist)만 순회하며, 노트 멤버는 메모리에서 파싱하고
+    file_<md5> 멤버는 대상 파일로 바로 스트리밍합니다.
+    """
+
+    def __init__(self, nsx_path):
+        self.zip = zipfile.ZipFile(nsx_path, 'r')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.zip.close()
+
+    @staticmethod
+    def member_name(info):
+        """zip 멤버의 파일 이름 (폴더 경로 제외)"""
+        return info.filename.rstrip('/').rsplit('/', 1)[-1]
+
+    def members(self):
+        """폴더를 제외한 모든 zip 멤버"""
+        return [info for info in self.zip.infolist() if not info.is_dir()]
+
+    def read_member(self, info):
+        """zip 멤버 전체를 바이트로 읽기"""
+        return self.zip.read(info)
+
+    def extract_blob(self, info, target_file):
+        """zip 멤버를 임시 폴더 없이 대상 파일로 바로 기록
+
+        .part 파일에 다 쓴 뒤 교체하므로 중단되어도 반쯤 쓴 파일이 남지 않습니다.
+        """
+        part_file = _part_path(target_file)
+        with self.zip.open(info) as src, open(part_file, 'wb') as dst:
+            shutil.copyfileobj(src, dst, COPY_BUFFER_SIZE)
+        os.replace(part_file, target_file)
+
+
+class _InflightBudget:
+    """동시에 기록 중인 바이트 수를 limit 이하로 제한
+
+    limit보다 큰 blob은 다른 기록이 모두 끝난 뒤 혼자 기록됩니다.
+    """
+
+    def __init__(self, limit):
+        self.limit = max(1, limit)
+        self.used = 0
+        self._cond = threading.Condition()
+
+    def acquire(self, size):
+        size = min(max(size, 1), self.limit)
+        with self._cond:
+            while self.used and self.used + size > self.limit:
+                self._cond.wait()
+            self.used += size
+        return size
+
+    def release(self, size):
+        with self._cond:
+            self.used -= size
+            self._cond.notify_all()
+
+
+def _reflink(source, target):
+    """copy-on-write 복제 (Linux FICLONE) - 지원하지 않으면 OSError"""
+    import fcntl
+    with open(source, 'rb') as src, open(target, 'wb') as dst:
+        fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+
+
+def _symlink(source, target):
+    """같은 폴더 안의 상대 경로 심볼릭 링크"""
+    os.symlink(os.path.relpath(source, os.path.dirname(target)), target)
+
+
+_LINKERS = {
+    'hardlink': os.link,
+    'reflink': _reflink,
+    'symlink': _symlink,
+}
+
+
+def materialize_file(source, target, mode='auto'):
+    """source와 같은 내용의 target 생성 - 실제로 사용한 방식 반환
+
+    mode가 "auto"면 하드링크 → reflink → 심볼릭 링크 순서로 시도하고,
+    지정한 방식이 실패하면 항상 복사로 대체합니다.
+    """
+    methods = LINK_MODES[1:-1] if mode == 'auto' else (mode,)
+    _remove_file(target)
+    for method in methods:
+        linker = _LINKERS.get(method)
+        if linker is None:
+            continue
+        try:
+            linker(source, target)
+            return method
+        except (OSError, ImportError, NotImplementedError):
+            _remove_file(target)
+    shutil.copyfile(source, target)
+    return 'copy'
+
+
+def _part_path(path):
+    """기록 중인 파일 경로"""
+    path = Path(path)
+    return path.with_name(path.name + PART_SUFFIX)
+
+
+def _remove_file(path):
+    """기존 파일/링크 삭제 - 하드링크로 공유된 내용을 덮어쓰지 않도록"""
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+class BlobWriter:
+    """file_<md5> blob을 스레드 풀로 대상 폴더에 기록
+
+    blob은 MD5마다 한 번만 압축 해제해서 첫 번째 파일명으로 기록하고,
+    같은 MD5의 나머지 파일명은 link_mode에 따라 링크(또는 복사)로 만듭니다.
+
+    네트워크 저장소처럼 지연 시간이 큰 환경에서 여러 파일을 동시에 기록합니다.
+    동시에 기록 중인 blob 크기의 합은 max_inflight_bytes를 넘지 않습니다.
+    결과는 제출 순서대로 on_done(md5, name, method, error) 콜백으로 현재 스레드에서
+    전달됩니다.
+    """
+
+    def __init__(self, archive, target_dir, on_done, workers=DEFAULT_IMAGE_WORKERS,
+                 max_inflight_bytes=DEFAULT_MAX_INFLIGHT_BYTES, link_mode='auto'):
+        self.archive = archive
+        self.target_dir = Path(target_dir)
+        self.on_done = on_done
+        self.link_mode = link_mode
+        self.budget = _InflightBudget(max_inflight_bytes)
+        self.executor = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+        self.pending = deque()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def submit(self, md5, info, names):
+        """blob 기록 예약 - names[0]에 기록하고 나머지는 링크, 허용량이 찰 때까지 대기"""
+        if self.executor is None:
+            self._report(md5, self._write(info, names))
+            return
+
+        size = self.budget.acquire(info.file_size)
+        future = self.executor.submit(self._write, info, names)
+        future.add_done_callback(lambda _: self.budget.release(size))
+        self.pending.append((md5, future))
+        self._drain(block=False)
+
+    def close(self):
+        """남은 기록을 모두 마치고 결과 전달"""
+        if self.executor is None:
+            return
+        self._drain(block=True)
+        self.executor.shutdown()
+
+    def _drain(self, block):
+        while self.pending and (block or self.pending[0][1].done()):
+            md5, future = self.pending.popleft()
+            self._report(md5, future.result())
+
+    def _report(self, md5, outcomes):
+        for name, method, error in outcomes:
+            self.on_done(md5, name, method, error)
+
+    def _write(self, info, names):
+        """[(파일명, 방식, 오류)] 반환"""
+        primary = self.target_dir / names[0]
+        try:
+            self.archive.extract_blob(info, primary)
+        except Exception as e:
+            return [(name, None, e) for name in names]
+
+        outcomes = [(names[0], 'write', None)]
+        for name in names[1:]:
+            try:
+                method = materialize_file(primary, self.target_dir / name, self.link_mode)
+                outcomes.append((name, method, None))
+            except Exception as e:
+                outcomes.append((name, None, e))
+        return outcomes
+
+
+class NoteRecord:
+    """인덱스에 저장되는 노트 한 개의 정보"""
+
+    def __init__(self, member, data, content_hash=None):
+        self.member = member
+        self.note_id = NSXArchive.member_name(member)
+        self.content_hash = content_hash
+        self.title = data.get("title", "untitled")
+        self.content = data.get("content", "")
+        self.attachments = data.get("attachment") or {}
+
+    def image_attachments(self):
+        """이미지 첨부 파일 정보만 반환"""
+        return [att_info for att_info in self.attachments.values()
+                if is_image_attachment(att_info)]
+
+
+class ArchiveIndex:
+    """아카이브를 한 번만 순회해서 만든 노트/첨부/blob 인덱스
+
+    모든 변환 단계는 zip을 다시 훑거나 노트를 다시 파싱하지 않고
+    이 인덱스를 조회합니다.
+    """
+
+    def __init__(self):
+        self.notes = []          # [NoteRecord] (아카이브 순서)
+        self.blobs = {}          # {md5: ZipInfo}
+        self.image_mapping = {}  # {md5: [names]} (같은 MD5에 여러 파일명 지원)
+        self.errors = []         # [(멤버 이름, 오류 메시지)]
+        self.member_count = 0
+
+    @classmethod
+    def build(cls, archive, executor=None, workers=1, on_progress=None):
+        """infolist를 한 번 순회하며 인덱스 생성
+
+        executor(ProcessPoolExecutor)가 주어지면 노트 파싱을 병렬로 처리합니다.
+        zip 읽기는 현재 프로세스에서 순서대로 하고, 결과도 아카이브 순서로 추가됩니다.
+        on_progress(처리한 후보 수, 전체 후보 수)는 묶음마다 호출됩니다.
+        """
+        index = cls()
+        candidates = index._scan(archive)
+        done = 0
+        for batch in _batched(candidates, NOTE_BATCH_SIZE * workers):
+            payloads = [archive.read_member(info) for info in batch]
+            results = _map_ordered(executor, _parse_note_task, payloads)
+            for info, (data, content_hash, error) in zip(batch, results):
+                if error is not None:
+                    index.errors.append((archive.member_name(info), error))
+                elif data is not None:
+                    index.add_note(NoteRecord(info, data, content_hash))
+            done += len(batch)
+            if on_progress is not None:
+                on_progress(done, len(candidates))
+        return index
+
+    def _scan(self, archive):
+        """blob 위치를 기록하면서 노트 후보 멤버 목록 반환"""
+        candidates = []
+        for info in archive.members():
+            self.member_count += 1
+            name = archive.member_name(info)
+
+            if name.startswith('file_'):
+                self.blobs[name[len('file_'):]] = info
+                continue
+
+            # 확장자 없는 파일만 노트 후보
+            if Path(name).suffix == "":
+                candidates.append(info)
+        return candidates
+
+    def add_note(self, note):
+        """노트와 그 이미지 첨부 정보를 인덱스에 추가"""
+        self.notes.append(note)
+        for att_info in note.image_attachments():
+            md5 = att_info.get('md5')
+            name = att_info.get('name', 'unknown')
+            if md5 and name:
+                names = self.image_mapping.setdefault(md5, [])
+                # 중복 방지
+                if name not in names:
+                    names.append(name)
+
+    @property
+    def image_count(self):
+        """저장될 이미지 파일 수 (MD5 x 파일명)"""
+        return sum(len(names) for names in self.image_mapping.values())
+
+    def image_blobs(self):
+        """실제 아카이브에 있는 이미지 blob을 (md5, ZipInfo, names)로 반환
+
+        서로 다른 MD5가 같은 파일명을 쓰면 마지막 MD5만 그 파일명을 가집니다
+        (순서대로 덮어쓴 결과와 동일). 모든 파일명을 빼앗긴 MD5는 건너뜁니다.
+        """
+        blobs = [(md5, self.blobs[md5], names)
+                 for md5, names in self.image_mapping.items() if md5 in self.blobs]
+        claimed = set()
+        owned = []
+        for md5, info, names in reversed(blobs):
+            own = [name for name in names if name not in claimed]
+            claimed.update(names)
+            if own:
+                owned.append((md5, info, own))
+        return reversed(owned)
+
+
+class OutputManifest:
+    """출력 폴더의 변환 기록 - 같은 폴더로 다시 변환할 때 바뀐 것만 기록
+
+    notes: {노트 ID: {"hash": 내용 해시, "title": 제목, "file": HTML 파일명}}
+    images: {MD5: [이미지 파일명]}
+    """
+
+    VERSION = 1
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.notes = {}
+        self.images = {}
+
+    @classmethod
+    def load(cls, output_dir):
+        """출력 폴더의 기록 읽기 - 없거나 손상되었으면 빈 기록"""
+        manifest = cls(Path(output_dir) / MANIFEST_NAME)
+        try:
+            data = json.loads(manifest.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return manifest
+        if isinstance(data, dict) and data.get('version') == cls.VERSION:
+            manifest.notes = data.get('notes') or {}
+            manifest.images = data.get('images') or {}
+        return manifest
+
+    def save(self):
+        """기록 저장 (임시 파일에 쓴 뒤 교체)"""
+        data = {'version': self.VERSION, 'notes': self.notes, 'images': self.images}
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def note_unchanged(self, note, output_dir):
+        """이전 변환 이후 내용이 같고 HTML 파일도 남아 있는지"""
+        entry = self.notes.get(note.note_id)
+        return (entry is not None and entry.get('hash') == note.content_hash
+                and (Path(output_dir) / entry['file']).exists())
+
+    def note_file(self, note_id, title):
+        """같은 제목으로 기록된 노트의 HTML 파일명 - 없으면 None"""
+        entry = self.notes.get(note_id)
+        if entry is not None and entry.get('title') == title:
+            return entry['file']
+        return None
+
+    def record_note(self, note, title, filename):
+        self.notes[note.note_id] = {
+            'hash': note.content_hash, 'title': title, 'file': filename,
+        }
+
+    def note_files(self):
+        """기록된 모든 HTML 파일명"""
+        return {entry['file'] for entry in self.notes.values()}
+
+    def images_unchanged(self, md5, names, images_dir):
+        """같은 MD5의 이미지가 모든 파일명으로 이미 기록되어 있는지"""
+        recorded = self.images.get(md5)
+        return (recorded is not None and set(names) <= set(recorded)
+                and all((Path(images_dir) / name).exists() for name in names))
+
+    def record_image(self, md5, name):
+        names = self.images.setdefault(md5, [])
+        if name not in names:
+            names.append(name)
+
+
+class ConversionJournal:
+    """완료한 노트와 이미지를 기록하는 체크포인트 저널 (JSON Lines)
+
+    변환이 끝나면 OutputManifest에 반영되고 삭제됩니다. 중간에 중단되면
+    남아 있는 저널을 다음 실행에서 replay()로 되살립니다.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._file = None
+        self._unsynced = 0
+
+    def replay(self, manifest, output_dir, images_dir, trust):
+        """이전 실행의 저널을 기록에 반영 - 되살린 (노트 수, 이미지 수) 반환
+
+        trust가 True(이어서 변환)면 파일이 남아 있고 크기가 같은 항목을 완료로
+        처리합니다. False면 파일명만 이어받아 모든 항목을 같은 파일에 다시 기록합니다.
+        """
+        notes = images = 0
+        try:
+            lines = self.path.read_text(encoding="utf-8").splitlines()
+        except OSError:
+            return notes, images
+
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # 중단 시점에 반쯤 쓴 마지막 줄
+                continue
+            if entry.get('type') == 'note':
+                complete = trust and _has_size(Path(output_dir) / entry['file'], entry['size'])
+                manifest.notes[entry['id']] = {
+                    'hash': entry['hash'] if complete else None,
+                    'title': entry['title'],
+                    'file': entry['file'],
+                }
+                if complete:
+                    notes += 1
+            elif entry.get('type') == 'image':
+                if trust and _has_size(Path(images_dir) / entry['name'], entry['size']):
+                    manifest.record_image(entry['md5'], entry['name'])
+                    images += 1
+        return notes, images
+
+    def open(self):
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    def close(self):
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+
+    def remove(self):
+        self.close()
+        _remove_file(self.path)
+
+    def record_note(self, note, title, filename, size):
+        self._append({'type': 'note', 'id': note.note_id, 'hash': note.content_hash,
+                      'title': title, 'file': filename, 'size': size})
+
+    def record_image(self, md5, name, size):
+        self._append({'type': 'image', 'md5': md5, 'name': name, 'size': size})
+
+    def sync(self):
+        """버퍼를 디스크에 기록 (fsync)"""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+
+    def _append(self, entry):
+        self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._unsynced += 1
+        if self._unsynced >= JOURNAL_SYNC_INTERVAL:
+            self.sync()
+
+
+def _has_size(path, size):
+    """파일이 있고 크기가 size인지"""
+    try:
+        return os.stat(path).st_size == size
+    except OSError:
+        return False
+
+
+def _default_log(message, level="info"):
+    pass
+
+
+def _default_progress(event):
+    pass
+
+
+class ConversionResult:
+    """변환 결과 요약"""
+
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+        self.note_count = 0
+        self.image_count = 0
+        self.linked_count = 0
+        self.skipped_note_count = 0
+        self.skipped_image_count = 0
+        self.error_count = 0
+        self.bytes_written = 0
+
+
+class ConversionEngine:
+    """NSX 파일을 HTML로 변환
+
+    log 콜백은 log(message, level) 형태로 호출되며,
+    level은 "info", "success", "warning", "error" 중 하나입니다.
+    progress 콜백은 항목을 처리할 때마다 progress(event)로 호출되며, event는
+    {"phase": "index" | "images" | "notes", "done": 처리 수, "total": 전체 수,
+    "bytes_written": 지금까지 기록한 바이트} 형태의 dict입니다.
+
+    workers가 2 이상이면 노트 파싱과 HTML 변환을 프로세스 풀에서 병렬로 처리합니다
+    (0 또는 None이면 CPU 개수). 파일명 결정과 저장은 항상 현재 프로세스에서
+    아카이브 순서대로 하므로 결과는 순차 실행과 바이트 단위로 같습니다.
+
+    이미지는 image_workers개 스레드로 기록하며, 동시에 기록 중인 blob 크기의
+    합은 max_inflight_bytes로 제한됩니다. 같은 MD5의 이미지는 한 번만 기록하고
+    나머지 파일명은 link_mode(LINK_MODES 참고)에 따라 링크로 만듭니다.
+
+    출력 폴더의 변환 기록(MANIFEST_NAME)을 이용해 이전 변환과 내용이 같은
+    노트와 이미지는 건너뛰고, 바뀐 노트는 같은 파일에 덮어씁니다.
+    force가 True면 내용이 같아도 모두 다시 기록합니다 (파일명은 유지).
+
+    완료한 노트와 이미지는 체크포인트 저널(JOURNAL_NAME)에 기록됩니다.
+    resume이 True면 중단된 이전 실행의 저널에서 이어서 변환합니다.
+    """
+
+    def __init__(self, nsx_path, output_path, log=None, workers=1,
+                 image_workers=DEFAULT_IMAGE_WORKERS,
+                 max_inflight_bytes=DEFAULT_MAX_INFLIGHT_BYTES, link_mode='auto',
+                 force=False, resume=False, progress=None):
+        if link_mode not in LINK_MODES:
+            raise ValueError(f"알 수 없는 링크 방식: {link_mode}")
+        self.nsx_path = nsx_path
+        self.output_dir = Path(output_path)
+        self.images_dir = self.output_dir / IMAGES_SUBDIR
+        self.log = log or _default_log
+        self.progress = progress or _default_progress
+        self.workers = workers or os.cpu_count() or 1
+        self.image_workers = image_workers
+        self.max_inflight_bytes = max_inflight_bytes
+        self.link_mode = link_mode
+        self.force = force
+        self.resume = resume
+        self.manifest = None
+        self.journal = None
+        self.result = None
+
+    def run(self):
+        """변환 실행 - zipfile.BadZipFile 등 오류는 호출한 쪽에서 처리"""
+        if self.workers > 1:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                return self._run(executor)
+        return self._run(None)
+
+    def _run(self, executor):
+        result = self.result = ConversionResult(self.output_dir)
+
+        # 출력 폴더 생성
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.log(f"📁 출력 폴더: {self.output_dir.resolve()}")
+
+        self.manifest = OutputManifest.load(self.output_dir)
+        self.journal = ConversionJournal(self.output_dir / JOURNAL_NAME)
+        restored_notes, restored_images = self.journal.replay(
+            self.manifest, self.output_dir, self.images_dir, trust=self.resume
+        )
+        if self.resume:
+            self.log(f"♻️ 체크포인트에서 이어서 변환 (완료된 노트 {restored_notes}개, "
+                     f"이미지 {restored_images}개)")
+        elif self.manifest.notes:
+            self.log(f"📋 이전 변환 기록 발견 ({len(self.manifest.notes)}개 노트) - 바뀐 항목만 기록합니다")
+
+        # 중단된 실행이 남긴 기록 중 파일 정리
+        self._remove_partial_files()
+
+        self.journal.open()
+        try:
+            self.log("📦 NSX 파일 여는 중...")
+            with NSXArchive(self.nsx_path) as archive:
+                self.log("🖼️ 노트 및 이미지 정보 수집 중...")
+                if executor is not None:
+                    self.log(f"⚡ 작업 프로세스 {self.workers}개 사용")
+                index = ArchiveIndex.build(
+                    archive, executor, self.workers,
+                    on_progress=lambda done, total: self.report_progress('index', done, total),
+                )
+                self.log(f"📊 {len(index.notes)}개 노트, {index.image_count}개의 이미지 정보 수집 완료 "
+                         f"(고유 MD5: {len(index.image_mapping)}개)", "success")
+
+                # 이미지 폴더 구조 생성
+                self.images_dir.mkdir(parents=True, exist_ok=True)
+
+                self.extract_images(archive, index, result)
+                self.convert_notes(index, result, executor)
+        finally:
+            self.journal.close()
+
+        # 완료되면 저널 내용은 변환 기록으로 옮기고 삭제
+        self.manifest.save()
+        self.journal.remove()
+        if result.skipped_note_count or result.skipped_image_count:
+            self.log(f"⏭️ 변경 없음: 노트 {result.skipped_note_count}개, "
+                     f"이미지 {result.skipped_image_count}개 건너뜀")
+        return result
+
+    def report_progress(self, phase, done, total):
+        self.progress({
+            'phase': phase,
+            'done': done,
+            'total': total,
+            'bytes_written': self.result.bytes_written,
+        })
+
+    def _remove_partial_files(self):
+        for folder in (self.output_dir, self.images_dir):
+            if folder.is_dir():
+                for part_file in folder.glob("*" + PART_SUFFIX):
+                    _remove_file(part_file)
+
+    def extract_images(self, archive, index, result):
+        """file_<md5> 멤버를 MD5마다 한 번 기록하고 나머지 이름은 링크로 생성"""
+        self.log("📁 이미지 파일 복사 중...")
+
+        pending = []
+        for md5_hash, info, names in index.image_blobs():
+            if not self.force and self.manifest.images_unchanged(md5_hash, names, self.images_dir):
+                result.skipped_image_count += len(names)
+                continue
+            pending.append((md5_hash, info, names))
+        total = sum(len(names) for _, _, names in pending)
+        done = [0]
+
+        def on_done(md5, name, method, error):
+            done[0] += 1
+            if error is None:
+                size = index.blobs[md5].file_size
+                result.image_count += 1
+                if method in ('write', 'copy'):
+                    result.bytes_written += size
+                else:
+                    result.linked_count += 1
+                self.manifest.record_image(md5, name)
+                self.journal.record_image(md5, name, size)
+            else:
+                self.log(f"⚠️ 이미지 복사 실패: {name}", "warning")
+            self.report_progress('images', done[0], total)
+
+        self.report_progress('images', 0, total)
+        with BlobWriter(archive, self.images_dir, on_done, self.image_workers,
+                        self.max_inflight_bytes, self.link_mode) as writer:
+            for md5_hash, info, names in pending:
+                writer.submit(md5_hash, info, names)
+
+        if result.image_count > 0:
+            self.log(f"✅ {result.image_count}개 이미지 파일 복사 완료", "success")
+            if result.linked_count > 0:
+                self.log(f"🔗 중복 이미지 {result.linked_count}개는 링크로 저장")
+        elif result.skipped_image_count == 0:
+            self.log("ℹ️ 이미지 파일이 없습니다")
+
+    def convert_notes(self, index, result, executor=None):
+        """인덱스의 노트를 HTML 파일로 변환"""
+        self.log("🔍 노트 변환 중...")
+
+        for member_name, error in index.errors:
+            self.log(f"❌ {member_name}: {error}", "error")
+            result.error_count += 1
+
+        notes = []
+        for note in index.notes:
+            if not note.content:
+                continue
+            if not self.force and self.manifest.note_unchanged(note, self.output_dir):
+                result.skipped_note_count += 1
+                continue
+            notes.append(note)
+
+        # 기록된 파일명은 다른 노트가 가져가지 않도록 예약
+        reserved = self.manifest.note_files()
+        done = 0
+        self.report_progress('notes', done, len(notes))
+        for batch in _batched(notes, NOTE_BATCH_SIZE * self.workers):
+            tasks = [(note.title, note.content, note.attachments) for note in batch]
+            rendered = _map_ordered(executor, _render_note_task, tasks)
+            for note, (title, html_content, error) in zip(batch, rendered):
+                done += 1
+                if error is None:
+                    try:
+                        self.write_note(note, title, html_content, reserved)
+                        self.log(f"✅ {title}.html", "success")
+                        result.note_count += 1
+                    except Exception as e:
+                        error = str(e)
+                if error is not None:
+                    self.log(f"❌ {note.note_id}: {error}", "error")
+                    result.error_count += 1
+                self.report_progress('notes', done, len(notes))
+
+    def write_note(self, note, title, html_content, reserved):
+        """HTML 파일로 저장 - 저장한 경로 반환
+
+        이전에 같은 제목으로 변환한 노트는 같은 파일에 덮어쓰고,
+        제목이 바뀐 노트는 새 파일명으로 저장한 뒤 이전 파일을 삭제합니다.
+        """
+        filename = self.manifest.note_file(note.note_id, title)
+        if filename is not None:
+            html_file = self.output_dir / filename
+        else:
+            html_file = self.output_dir / f"{title}.html"
+
+            # 중복 파일명 처리
+            counter = 1
+            while html_file.exists() or html_file.name in reserved:
+                html_file = self.output_dir / f"{title}_{counter}.html"
+                counter += 1
+
+        # .part 파일에 다 쓴 뒤 교체 - 중단되어도 반쯤 쓴 HTML이 남지 않음
+        part_file = _part_path(html_file)
+        with open(part_file, "w", encoding="utf-8") as h:
+            h.write(html_content)
+            h.flush()
+            size = os.fstat(h.fileno()).st_size
+        os.replace(part_file, html_file)
+        self.result.bytes_written += size
+
+        old_entry = self.manifest.notes.get(note.note_id)
+        if old_entry is not None and old_entry['file'] != html_file.name:
+            reserved.discard(old_entry['file'])
+            _remove_file(self.output_dir / old_entry['file'])
+        reserved.add(html_file.name)
+        self.manifest.record_note(note, title, html_file.name)
+        self.journal.record_note(note, title, html_file.name, size)
+        return html_file
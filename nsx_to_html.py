@@ -1,13 +1,21 @@
-import os
-import json
+import queue
 import zipfile
-import shutil
 import tkinter as tk
 from tkinter import filedialog, messagebox, scrolledtext, ttk
 from pathlib import Path
 from threading import Thread
-import tempfile
-import re
+
+from nsx_engine import ConversionEngine
+
+
+# 변환 스레드가 보낸 이벤트를 화면에 반영하는 간격 (약 20fps)
+EVENT_POLL_INTERVAL_MS = 50
+
+# 한 번에 처리하는 최대 이벤트 수 - 로그가 폭주해도 화면이 멈추지 않도록
+MAX_EVENTS_PER_FRAME = 5000
+
+# 로그 창에 남겨두는 최대 줄 수 (오래된 줄부터 삭제)
+MAX_LOG_LINES = 5000
 
 
 class NsxConverterGUI:
@@ -21,7 +29,11 @@ class NsxConverterGUI:
         self.output_dir = None
         self.is_running = False
         
+        # 변환 스레드 → 메인 루프 이벤트 큐 (Tk 위젯은 메인 스레드에서만 다룸)
+        self.events = queue.Queue()
+        
         self.setup_ui()
+        self.root.after(EVENT_POLL_INTERVAL_MS, self.process_events)
         
     def setup_ui(self):
         # 상단 프레임
@@ -78,10 +90,42 @@ class NsxConverterGUI:
         self.log_text.pack(fill=tk.BOTH, expand=True)
         
     def log(self, message):
-        """로그 메시지 추가"""
-        self.log_text.insert(tk.END, message + "\n")
+        """로그 메시지 추가 (어느 스레드에서나 호출 가능)"""
+        self.events.put(('log', message))
+        
+    def call_in_ui(self, func, *args):
+        """func(*args)를 메인 스레드에서 실행하도록 예약"""
+        self.events.put(('call', func, args))
+        
+    def process_events(self):
+        """쌓인 이벤트를 한 번에 처리 - 로그는 모아서 한 번만 삽입"""
+        lines = []
+        try:
+            for _ in range(MAX_EVENTS_PER_FRAME):
+                event = self.events.get_nowait()
+                if event[0] == 'log':
+                    lines.append(event[1])
+                    continue
+                # 순서를 지키기 위해 앞서 쌓인 로그를 먼저 반영
+                self.append_log(lines)
+                lines = []
+                _, func, args = event
+                func(*args)
+        except queue.Empty:
+            pass
+        self.append_log(lines)
+        self.root.after(EVENT_POLL_INTERVAL_MS, self.process_events)
+        
+    def append_log(self, lines):
+        """로그 창에 여러 줄 추가 - MAX_LOG_LINES를 넘으면 오래된 줄 삭제"""
+        if not lines:
+            return
+        self.log_text.insert(tk.END, "\n".join(lines) + "\n")
+        # 마지막 줄바꿈 뒤의 빈 줄을 빼면 실제 줄 수
+        line_count = int(self.log_text.index('end-1c').split('.')[0]) - 1
+        if line_count > MAX_LOG_LINES:
+            self.log_text.delete('1.0', f'{line_count - MAX_LOG_LINES + 1}.0')
         self.log_text.see(tk.END)
-        self.root.update()
         
     def select_nsx_file(self):
         """NSX 파일 선택"""
@@ -100,61 +144,6 @@ class NsxConverterGUI:
             self.output_entry.delete(0, tk.END)
             self.output_entry.insert(0, dir_path)
     
-    def fix_image_paths(self, html_content, attachments=None):
-        """HTML 내의 이미지 경로를 실제 파일명으로 수정"""
-        if not attachments:
-            return html_content
-        
-        # ref -> 파일명 매핑 생성
-        ref_to_filename = {}
-        for att_id, att_info in attachments.items():
-            # 이미지 파일 확인 - type 필드 또는 파일 확장자로 확인
-            att_type = att_info.get('type', '').lower()
-            att_name = att_info.get('name', '').lower()
-            
-            # image/ 로 시작하는 타입이거나, 이미지 확장자를 가진 경우
-            is_image = (att_type.startswith('image/') or 
-                       att_name.endswith(('.png', '.jpg', '.jpeg', '.gif', '.bmp', '.webp', '.svg')))
-            
-            if is_image:
-                ref = att_info.get('ref', '')
-                name = att_info.get('name', '')
-                if ref and name:
-                    ref_to_filename[ref] = name
-        
-        # ref 속성이 있는 img 태그를 찾아서 src 수정
-        def replace_img(match):
-            full_tag = match.group(0)
-            
-            # ref 속성 찾기
-            ref_match = re.search(r'ref="([^"]+)"', full_tag)
-            if ref_match:
-                ref_value = ref_match.group(1)
-                if ref_value in ref_to_filename:
-                    # src를 실제 이미지 경로로 교체
-                    filename = ref_to_filename[ref_value]
-                    new_src = f'webman/3rdparty/NoteStation/images/{filename}'
-                    # src 속성 교체
-                    full_tag = re.sub(
-                        r'src="[^"]*"',
-                        f'src="{new_src}"',
-                        full_tag
-                    )
-            
-            return full_tag
-        
-        # img 태그 전체를 찾아서 교체
-        html_content = re.sub(r'<img[^>]*>', replace_img, html_content)
-        
-        return html_content
-            
-    def sanitize_filename(self, name: str) -> str:
-        """파일 이름으로 쓸 수 없는 문자 제거"""
-        invalid = r'\/:*?"<>|'
-        for ch in invalid:
-            name = name.replace(ch, "_")
-        return name.strip() or "untitled"
-        
     def start_conversion(self):
         """변환 시작"""
         if self.is_running:
@@ -183,196 +172,46 @@ class NsxConverterGUI:
         
     def convert(self, nsx_path, output_path):
         """실제 변환 작업"""
-        temp_dir = None
+        def log(msg, level="info"):
+            self.log(msg)
         
         try:
             self.log("🚀 변환 시작...")
             self.log(f"📂 NSX 파일: {nsx_path}")
             
-            # 출력 폴더 생성
-            output_dir = Path(output_path)
-            output_dir.mkdir(parents=True, exist_ok=True)
-            self.log(f"📁 출력 폴더: {output_dir.resolve()}")
-            
-            # 임시 폴더에 압축 해제
-            temp_dir = Path(tempfile.mkdtemp())
-            self.log(f"\n📦 NSX 파일 압축 해제 중...")
-            
-            with zipfile.ZipFile(nsx_path, 'r') as zip_ref:
-                zip_ref.extractall(temp_dir)
-                
-            self.log(f"✅ 압축 해제 완료")
-            
-            # 이미지 폴더 구조 생성
-            images_dir = output_dir / "webman" / "3rdparty" / "NoteStation" / "images"
-            images_dir.mkdir(parents=True, exist_ok=True)
-            
-            # 이미지-md5 매핑 수집 (같은 MD5에 여러 파일명 지원)
-            image_mapping = {}  # {md5: [names]}
-            image_count = 0
-            
-            self.log("\n🖼️ 이미지 정보 수집 중...")
-            
-            # 모든 노트 파일에서 attachment 정보 수집
-            for folder, _, files in os.walk(temp_dir):
-                for file in files:
-                    file_path = Path(folder) / file
-                    # 확장자 없는 파일만 확인 (file_로 시작하는 것 제외)
-                    if file_path.suffix == "" and not file_path.name.startswith('file_'):
-                        try:
-                            text = file_path.read_text(encoding="utf-8", errors="ignore")
-                            # JSON 파일인지 확인
-                            if not text.strip().startswith('{'):
-                                continue
-                            
-                            data = json.loads(text)
-                            # category가 note인 것만 처리
-                            if data.get('category') != 'note':
-                                continue
-                            
-                            attachments = data.get("attachment", {})
-                            if not attachments:
-                                continue
-                            
-                            for att_id, att_info in attachments.items():
-                                # 이미지 파일 확인 - type 필드 또는 파일 확장자로 확인
-                                att_type = att_info.get('type', '').lower()
-                                att_name = att_info.get('name', '').lower()
-                                
-                                # image/ 로 시작하는 타입이거나, 이미지 확장자를 가진 경우
-                                is_image = (att_type.startswith('image/') or 
-                                           att_name.endswith(('.png', '.jpg', '.jpeg', '.gif', '.bmp', '.webp', '.svg')))
-                                
-                                if is_image:
-                                    md5 = att_info.get('md5')
-                                    name = att_info.get('name', 'unknown')
-                                    if md5 and name:
-                                        if md5 not in image_mapping:
-                                            image_mapping[md5] = []
-                                        # 중복 방지
-                                        if name not in image_mapping[md5]:
-                                            image_mapping[md5].append(name)
-                        except:
-                            continue
-            
-            total_images = sum(len(names) for names in image_mapping.values())
-            self.log(f"📊 {total_images}개의 이미지 정보 수집 완료 (고유 MD5: {len(image_mapping)}개)")
-            
-            # file_<md5> 파일들을 모든 이미지 이름으로 복사
-            self.log("📁 이미지 파일 복사 중...")
-            for folder, _, files in os.walk(temp_dir):
-                for file in files:
-                    if file.startswith('file_'):
-                        md5_hash = file.replace('file_', '')
-                        if md5_hash in image_mapping:
-                            source_file = Path(folder) / file
-                            
-                            # 같은 MD5를 가진 모든 파일명으로 복사
-                            for name in image_mapping[md5_hash]:
-                                target_file = images_dir / name
-                                
-                                try:
-                                    shutil.copy2(source_file, target_file)
-                                    image_count += 1
-                                except Exception as e:
-                                    self.log(f"⚠️ 이미지 복사 실패: {name}")
-            
-            if image_count > 0:
-                self.log(f"✅ {image_count}개 이미지 파일 복사 완료")
-            else:
-                self.log("ℹ️ 이미지 파일이 없습니다")
-            
-            # 노트 파일 찾기 및 변환
-            note_count = 0
-            error_count = 0
-            
-            self.log("\n🔍 노트 파일 검색 및 변환 중...\n")
-            
-            for folder, _, files in os.walk(temp_dir):
-                for file in files:
-                    file_path = Path(folder) / file
-                    
-                    # 확장자 없는 파일만 확인 (file_로 시작하는 것 제외)
-                    if file_path.suffix == "" and not file_path.name.startswith('file_'):
-                        try:
-                            text = file_path.read_text(encoding="utf-8", errors="ignore")
-                            
-                            # JSON 파일인지 확인
-                            if not text.strip().startswith('{'):
-                                continue
-                            
-                            data = json.loads(text)
-                            
-                            # category가 note인 것만 처리
-                            if data.get('category') != 'note':
-                                continue
-                            
-                            if '"content"' not in text:
-                                continue
-                            title = self.sanitize_filename(data.get("title", "untitled"))
-                            html_content = data.get("content", "")
-                            attachments = data.get("attachment", {})
-                            
-                            if not html_content:
-                                continue
-                            
-                            # 이미지 경로 수정 (attachment 정보 전달)
-                            html_content = self.fix_image_paths(html_content, attachments)
-                            
-                            # HTML 파일로 저장
-                            html_file = output_dir / f"{title}.html"
-                            
-                            counter = 1
-                            while html_file.exists():
-                                html_file = output_dir / f"{title}_{counter}.html"
-                                counter += 1
-                            
-                            with open(html_file, "w", encoding="utf-8") as h:
-                                h.write(html_content)
-                            
-                            self.log(f"✅ {title}.html")
-                            note_count += 1
-                        
-                        except json.JSONDecodeError:
-                            continue
-                        except Exception as e:
-                            self.log(f"❌ {file_path.name}: {str(e)}")
-                            error_count += 1
+            result = ConversionEngine(nsx_path, output_path, log).run()
             
             # 결과 출력
             self.log("\n" + "="*50)
-            self.log(f"✅ 변환 완료! 성공: {note_count}개 노트")
-            if image_count > 0:
-                self.log(f"🖼️ 이미지: {image_count}개 (webman 폴더에 저장)")
-            if error_count > 0:
-                self.log(f"⚠️ 실패: {error_count}개")
-            self.log(f"📁 저장 위치: {output_dir.resolve()}")
+            self.log(f"✅ 변환 완료! 성공: {result.note_count}개 노트")
+            if result.image_count > 0:
+                self.log(f"🖼️ 이미지: {result.image_count}개 (webman 폴더에 저장)")
+            if result.error_count > 0:
+                self.log(f"⚠️ 실패: {result.error_count}개")
+            self.log(f"📁 저장 위치: {result.output_dir.resolve()}")
             self.log("="*50)
             
-            messagebox.showinfo(
+            self.call_in_ui(
+                messagebox.showinfo,
                 "변환 완료", 
-                f"✅ {note_count}개 노트가 변환되었습니다.\n\n"
-                f"📁 {output_dir.resolve()}"
+                f"✅ {result.note_count}개 노트가 변환되었습니다.\n\n"
+                f"📁 {result.output_dir.resolve()}"
             )
             
         except zipfile.BadZipFile:
             self.log("\n❌ 오류: 유효하지 않은 NSX 파일입니다.")
-            messagebox.showerror("오류", "유효하지 않은 NSX 파일입니다.")
+            self.call_in_ui(messagebox.showerror, "오류", "유효하지 않은 NSX 파일입니다.")
         except Exception as e:
             self.log(f"\n❌ 오류 발생: {str(e)}")
-            messagebox.showerror("오류", f"변환 중 오류가 발생했습니다:\n{str(e)}")
+            self.call_in_ui(messagebox.showerror, "오류", f"변환 중 오류가 발생했습니다:\n{str(e)}")
         finally:
-            # 임시 폴더 정리
-            if temp_dir and temp_dir.exists():
-                try:
-                    shutil.rmtree(temp_dir)
-                    self.log(f"\n🧹 임시 폴더 정리 완료")
-                except Exception as e:
-                    self.log(f"\n⚠️  임시 폴더 정리 실패: {str(e)}")
+            self.call_in_ui(self.finish_conversion)
             
-            self.is_running = False
-            self.convert_btn.config(state=tk.NORMAL)
-            self.progress_bar.stop()
+    def finish_conversion(self):
+        """변환 종료 후 UI 복원 (메인 스레드)"""
+        self.is_running = False
+        self.convert_btn.config(state=tk.NORMAL)
+        self.progress_bar.stop()
 
 
 def main():
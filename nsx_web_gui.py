@@ -1,15 +1,19 @@
-import os
 import json
+import time
+import uuid
 import zipfile
-import shutil
-from pathlib import Path
-import tempfile
 import webbrowser
 import threading
 from http.server import HTTPServer, BaseHTTPRequestHandler
-from urllib.parse import parse_qs, unquote
-import base64
-import re
+from urllib.parse import parse_qs, unquote, urlparse
+
+import nsx_engine
+
+
+# SSE 스트림에서 이벤트를 모아 보내는 최소 간격 (초)
+SSE_MIN_INTERVAL = 0.2
+# 변화가 없을 때 연결 유지를 위해 주석을 보내는 간격 (초)
+SSE_KEEPALIVE = 15.0
 
 
 class NSXConverter:
@@ -18,233 +22,53 @@ class NSXConverter:
     @staticmethod
     def fix_image_paths(html_content, attachments=None):
         """HTML 내의 이미지 경로를 실제 파일명으로 수정"""
-        if not attachments:
-            return html_content
-        
-        # ref -> 파일명 매핑 생성
-        ref_to_filename = {}
-        for att_id, att_info in attachments.items():
-            # 이미지 파일 확인 - type 필드 또는 파일 확장자로 확인
-            att_type = att_info.get('type', '').lower()
-            att_name = att_info.get('name', '').lower()
-            
-            # image/ 로 시작하는 타입이거나, 이미지 확장자를 가진 경우
-            is_image = (att_type.startswith('image/') or 
-                       att_name.endswith(('.png', '.jpg', '.jpeg', '.gif', '.bmp', '.webp', '.svg')))
-            
-            if is_image:
-                ref = att_info.get('ref', '')
-                name = att_info.get('name', '')
-                if ref and name:
-                    ref_to_filename[ref] = name
-        
-        # ref 속성이 있는 img 태그를 찾아서 src 수정
-        def replace_img(match):
-            full_tag = match.group(0)
-            
-            # ref 속성 찾기
-            ref_match = re.search(r'ref="([^"]+)"', full_tag)
-            if ref_match:
-                ref_value = ref_match.group(1)
-                if ref_value in ref_to_filename:
-                    # src를 실제 이미지 경로로 교체
-                    filename = ref_to_filename[ref_value]
-                    new_src = f'webman/3rdparty/NoteStation/images/{filename}'
-                    # src 속성 교체
-                    full_tag = re.sub(
-                        r'src="[^"]*"',
-                        f'src="{new_src}"',
-                        full_tag
-                    )
-            
-            return full_tag
-        
-        # img 태그 전체를 찾아서 교체
-        html_content = re.sub(r'<img[^>]*>', replace_img, html_content)
-        
-        return html_content
+        return nsx_engine.fix_image_paths(html_content, attachments)
     
     @staticmethod
     def sanitize_filename(name: str) -> str:
         """파일 이름으로 쓸 수 없는 문자 제거"""
-        invalid = r'\/:*?"<>|'
-        for ch in invalid:
-            name = name.replace(ch, "_")
-        return name.strip() or "untitled"
+        return nsx_engine.sanitize_filename(name)
     
     @staticmethod
-    def convert(nsx_path, output_path, log_callback=None):
-        """NSX 파일을 Markdown으로 변환"""
-        def log(msg):
+    def convert(nsx_path, output_path, log_callback=None, workers=1,
+                image_workers=nsx_engine.DEFAULT_IMAGE_WORKERS,
+                max_inflight_bytes=nsx_engine.DEFAULT_MAX_INFLIGHT_BYTES,
+                link_mode='auto', force=False, resume=False, progress_callback=None):
+        """NSX 파일을 HTML로 변환
+
+        workers: 노트 변환 프로세스 수, image_workers: 이미지 기록 스레드 수,
+        max_inflight_bytes: 동시에 기록 중인 이미지 크기 합계 상한,
+        link_mode: 같은 MD5 이미지의 다른 파일명을 만드는 방식,
+        force: 이전 변환 기록과 내용이 같아도 모두 다시 기록,
+        resume: 중단된 이전 변환의 체크포인트에서 이어서 변환,
+        progress_callback: 진행 상황 dict를 받는 콜백 (ConversionEngine의 progress)
+        """
+        def log(msg, level="info"):
             if log_callback:
                 log_callback(msg)
         
-        temp_dir = None
-        
         try:
             log("🚀 변환 시작...")
             log(f"📂 NSX 파일: {nsx_path}")
             
-            # 출력 폴더 생성
-            output_dir = Path(output_path)
-            output_dir.mkdir(parents=True, exist_ok=True)
-            log(f"📁 출력 폴더: {output_dir.resolve()}")
-            
-            # 임시 폴더에 압축 해제
-            temp_dir = Path(tempfile.mkdtemp())
-            log("📦 NSX 파일 압축 해제 중...")
-            
-            with zipfile.ZipFile(nsx_path, 'r') as zip_ref:
-                zip_ref.extractall(temp_dir)
-            
-            log("✅ 압축 해제 완료")
-            
-            # 이미지 폴더 구조 생성
-            images_dir = output_dir / "webman" / "3rdparty" / "NoteStation" / "images"
-            images_dir.mkdir(parents=True, exist_ok=True)
-            
-            # 이미지-md5 매핑 수집 (같은 MD5에 여러 파일명 지원)
-            image_mapping = {}  # {md5: [names]}
-            image_count = 0
-            
-            log("🖼️ 이미지 정보 수집 중...")
-            
-            # 모든 노트 파일에서 attachment 정보 수집
-            for folder, _, files in os.walk(temp_dir):
-                for file in files:
-                    file_path = Path(folder) / file
-                    # 확장자 없는 파일만 확인 (file_로 시작하는 것 제외)
-                    if file_path.suffix == "" and not file_path.name.startswith('file_'):
-                        try:
-                            text = file_path.read_text(encoding="utf-8", errors="ignore")
-                            # JSON 파일인지 확인
-                            if not text.strip().startswith('{'):
-                                continue
-                            
-                            data = json.loads(text)
-                            # category가 note인 것만 처리
-                            if data.get('category') != 'note':
-                                continue
-                            
-                            attachments = data.get("attachment", {})
-                            if not attachments:
-                                continue
-                            
-                            for att_id, att_info in attachments.items():
-                                # 이미지 파일 확인 - type 필드 또는 파일 확장자로 확인
-                                att_type = att_info.get('type', '').lower()
-                                att_name = att_info.get('name', '').lower()
-                                
-                                # image/ 로 시작하는 타입이거나, 이미지 확장자를 가진 경우
-                                is_image = (att_type.startswith('image/') or 
-                                           att_name.endswith(('.png', '.jpg', '.jpeg', '.gif', '.bmp', '.webp', '.svg')))
-                                
-                                if is_image:
-                                    md5 = att_info.get('md5')
-                                    name = att_info.get('name', 'unknown')
-                                    if md5 and name:
-                                        if md5 not in image_mapping:
-                                            image_mapping[md5] = []
-                                        # 중복 방지
-                                        if name not in image_mapping[md5]:
-                                            image_mapping[md5].append(name)
-                        except:
-                            continue
-            
-            total_images = sum(len(names) for names in image_mapping.values())
-            log(f"📊 {total_images}개의 이미지 정보 수집 완료 (고유 MD5: {len(image_mapping)}개)")
-            
-            # file_<md5> 파일들을 모든 이미지 이름으로 복사
-            log("📁 이미지 파일 복사 중...")
-            for folder, _, files in os.walk(temp_dir):
-                for file in files:
-                    if file.startswith('file_'):
-                        md5_hash = file.replace('file_', '')
-                        if md5_hash in image_mapping:
-                            source_file = Path(folder) / file
-                            
-                            # 같은 MD5를 가진 모든 파일명으로 복사
-                            for name in image_mapping[md5_hash]:
-                                target_file = images_dir / name
-                                
-                                try:
-                                    shutil.copy2(source_file, target_file)
-                                    image_count += 1
-                                except Exception as e:
-                                    log(f"⚠️ 이미지 복사 실패: {name}")
-            
-            if image_count > 0:
-                log(f"✅ {image_count}개 이미지 파일 복사 완료")
-            else:
-                log("ℹ️ 이미지 파일이 없습니다")
-            
-            # 노트 파일 찾기 및 변환
-            note_count = 0
-            error_count = 0
-            
-            log("🔍 노트 파일 검색 및 변환 중...")
-            
-            for folder, _, files in os.walk(temp_dir):
-                for file in files:
-                    file_path = Path(folder) / file
-                    
-                    # 확장자 없는 파일만 확인 (file_로 시작하는 것 제외)
-                    if file_path.suffix == "" and not file_path.name.startswith('file_'):
-                        try:
-                            text = file_path.read_text(encoding="utf-8", errors="ignore")
-                            
-                            # JSON 파일인지 확인
-                            if not text.strip().startswith('{'):
-                                continue
-                            
-                            data = json.loads(text)
-                            
-                            # category가 note인 것만 처리
-                            if data.get('category') != 'note':
-                                continue
-                            
-                            if '"content"' not in text:
-                                continue
-                            title = NSXConverter.sanitize_filename(data.get("title", "untitled"))
-                            html_content = data.get("content", "")
-                            attachments = data.get("attachment", {})
-                            
-                            if not html_content:
-                                continue
-                            
-                            # 이미지 경로 수정 (attachment 정보 전달)
-                            html_content = NSXConverter.fix_image_paths(html_content, attachments)
-                            
-                            # HTML 파일로 저장
-                            html_file = output_dir / f"{title}.html"
-                            
-                            counter = 1
-                            while html_file.exists():
-                                html_file = output_dir / f"{title}_{counter}.html"
-                                counter += 1
-                            
-                            with open(html_file, "w", encoding="utf-8") as h:
-                                h.write(html_content)
-                            
-                            log(f"✅ {title}.html")
-                            note_count += 1
-                        
-                        except json.JSONDecodeError:
-                            continue
-                        except Exception as e:
-                            log(f"❌ {file_path.name}: {str(e)}")
-                            error_count += 1
+            result = nsx_engine.ConversionEngine(
+                nsx_path, output_path, log, workers=workers,
+                image_workers=image_workers,
+                max_inflight_bytes=max_inflight_bytes,
+                link_mode=link_mode, force=force, resume=resume,
+                progress=progress_callback,
+            ).run()
             
             log("="*50)
-            log(f"✅ 변환 완료! 성공: {note_count}개 노트")
-            if image_count > 0:
-                log(f"🖼️ 이미지: {image_count}개 (webman 폴더에 저장)")
-            if error_count > 0:
-                log(f"⚠️ 실패: {error_count}개")
-            log(f"📁 저장 위치: {output_dir.resolve()}")
+            log(f"✅ 변환 완료! 성공: {result.note_count}개 노트")
+            if result.image_count > 0:
+                log(f"🖼️ 이미지: {result.image_count}개 (webman 폴더에 저장)")
+            if result.error_count > 0:
+                log(f"⚠️ 실패: {result.error_count}개")
+            log(f"📁 저장 위치: {result.output_dir.resolve()}")
             log("="*50)
             
-            return True, note_count, error_count
+            return True, result.note_count, result.error_count
         
         except zipfile.BadZipFile:
             log("❌ 오류: 유효하지 않은 NSX 파일입니다.")
@@ -252,19 +76,90 @@ class NSXConverter:
         except Exception as e:
             log(f"❌ 오류 발생: {str(e)}")
             return False, 0, 0
-        finally:
-            if temp_dir and temp_dir.exists():
-                try:
-                    shutil.rmtree(temp_dir)
-                    log("🧹 임시 폴더 정리 완료")
-                except Exception as e:
-                    log(f"⚠️ 임시 폴더 정리 실패: {str(e)}")
+
+
+class ConversionJob:
+    """백그라운드에서 실행되는 변환 작업
+
+    로그와 진행 상황이 바뀔 때마다 version을 올리고 changed 조건 변수로
+    대기 중인 SSE 스트림을 깨웁니다.
+    """
+    
+    def __init__(self, nsx_path, output_path, resume=False):
+        self.id = uuid.uuid4().hex
+        self.nsx_path = nsx_path
+        self.output_path = output_path
+        self.resume = resume
+        self.state = 'queued'
+        self.logs = []
+        self.progress = {'phase': None, 'done': 0, 'total': 0, 'bytes_written': 0, 'eta': None}
+        self.result = None
+        self.version = 0
+        self.changed = threading.Condition()
+        self._phase_started = None
+    
+    @property
+    def finished(self):
+        return self.state in ('done', 'failed')
+    
+    def start(self):
+        threading.Thread(target=self.run, daemon=True).start()
+    
+    def run(self):
+        self._update(state='running')
+        success, note_count, error_count = NSXConverter.convert(
+            self.nsx_path, self.output_path, self.add_log,
+            resume=self.resume, progress_callback=self.update_progress,
+        )
+        self._update(
+            state='done' if success else 'failed',
+            result={'success': success, 'note_count': note_count, 'error_count': error_count},
+        )
+    
+    def _update(self, **fields):
+        with self.changed:
+            for name, value in fields.items():
+                setattr(self, name, value)
+            self.version += 1
+            self.changed.notify_all()
+    
+    def add_log(self, msg):
+        with self.changed:
+            self.logs.append(msg)
+            self.version += 1
+            self.changed.notify_all()
+    
+    def update_progress(self, event):
+        """엔진 진행 이벤트에 현재 단계의 남은 시간(초) 추정치를 붙여 저장"""
+        now = time.monotonic()
+        with self.changed:
+            if event['phase'] != self.progress['phase']:
+                self._phase_started = now
+            elapsed = now - self._phase_started
+            done, total = event['done'], event['total']
+            eta = None
+            if done and elapsed > 0:
+                eta = (total - done) * elapsed / done
+            self.progress = dict(event, eta=eta)
+            self.version += 1
+            self.changed.notify_all()
+    
+    def snapshot(self):
+        with self.changed:
+            return {
+                'job_id': self.id,
+                'state': self.state,
+                'progress': dict(self.progress),
+                'result': self.result,
+                'log_count': len(self.logs),
+            }
 
 
 class WebGUIHandler(BaseHTTPRequestHandler):
     """웹 GUI 핸들러"""
     
-    log_messages = []
+    jobs = {}
+    last_job = None
     
     def log_message(self, format, *args):
         """서버 로그 숨기기"""
@@ -272,17 +167,28 @@ class WebGUIHandler(BaseHTTPRequestHandler):
     
     def do_GET(self):
         """GET 요청 처리"""
-        if self.path == '/':
+        path = urlparse(self.path).path
+        parts = path.strip('/').split('/')
+        if path == '/':
             self.send_response(200)
             self.send_header('Content-type', 'text/html; charset=utf-8')
             self.end_headers()
             self.wfile.write(self.get_html().encode('utf-8'))
-        elif self.path == '/logs':
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json; charset=utf-8')
-            self.end_headers()
-            logs = '\n'.join(WebGUIHandler.log_messages)
-            self.wfile.write(json.dumps({'logs': logs}).encode('utf-8'))
+        elif path == '/logs':
+            job = WebGUIHandler.last_job
+            logs = '\n'.join(job.logs) if job else ''
+            self.send_json({'logs': logs})
+        elif len(parts) in (2, 3) and parts[0] == 'jobs':
+            job = WebGUIHandler.jobs.get(parts[1])
+            if job is None:
+                self.send_json({'error': '작업을 찾을 수 없습니다.'}, status=404)
+            elif len(parts) == 2:
+                self.send_json(job.snapshot())
+            elif parts[2] == 'events':
+                self.stream_events(job)
+            else:
+                self.send_response(404)
+                self.end_headers()
         else:
             self.send_response(404)
             self.end_headers()
@@ -296,28 +202,82 @@ class WebGUIHandler(BaseHTTPRequestHandler):
             
             nsx_path = params.get('nsx_path', [''])[0]
             output_path = params.get('output_path', [''])[0]
+            resume = params.get('resume', [''])[0] == '1'
             
-            WebGUIHandler.log_messages = []
-            
-            def log_callback(msg):
-                WebGUIHandler.log_messages.append(msg)
-            
-            # 변환 실행
-            success, note_count, error_count = NSXConverter.convert(
-                nsx_path, output_path, log_callback
-            )
+            # 변환은 백그라운드에서 실행하고 작업 ID만 바로 반환
+            job = ConversionJob(nsx_path, output_path, resume=resume)
+            WebGUIHandler.jobs[job.id] = job
+            WebGUIHandler.last_job = job
+            job.start()
             
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json; charset=utf-8')
+            self.send_json({'job_id': job.id}, status=202)
+        else:
+            self.send_response(404)
             self.end_headers()
-            
-            response = {
-                'success': success,
-                'note_count': note_count,
-                'error_count': error_count,
-                'logs': '\n'.join(WebGUIHandler.log_messages)
-            }
-            self.wfile.write(json.dumps(response).encode('utf-8'))
+    
+    def send_json(self, data, status=200):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def stream_events(self, job):
+        """작업 진행 상황을 Server-Sent Events로 전송
+
+        log 이벤트의 id는 지금까지 보낸 로그 줄 수이므로, 재연결 시 브라우저가
+        보내는 Last-Event-ID 이후의 로그만 다시 보냅니다.
+        """
+        try:
+            sent_logs = int(self.headers.get('Last-Event-ID', 0))
+        except ValueError:
+            sent_logs = 0
+        
+        self.send_response(200)
+        self.send_header('Content-type', 'text/event-stream; charset=utf-8')
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        
+        version = -1
+        try:
+            while True:
+                with job.changed:
+                    job.changed.wait_for(lambda: job.version != version, timeout=SSE_KEEPALIVE)
+                    if job.version == version:
+                        self.wfile.write(b': keepalive\n\n')
+                        self.wfile.flush()
+                        continue
+                    version = job.version
+                    lines = job.logs[sent_logs:]
+                    sent_logs = len(job.logs)
+                    progress = dict(job.progress)
+                    finished = job.finished
+                    result = job.result
+                
+                chunks = []
+                if lines:
+                    chunks.append(self.format_event('log', {'lines': lines}, sent_logs))
+                if progress['phase'] is not None:
+                    chunks.append(self.format_event('progress', progress))
+                if finished:
+                    chunks.append(self.format_event('done', dict(result, state=job.state)))
+                self.wfile.write(b''.join(chunks))
+                self.wfile.flush()
+                if finished:
+                    break
+                # 잦은 진행 이벤트를 묶어서 보냄
+                time.sleep(SSE_MIN_INTERVAL)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+    
+    @staticmethod
+    def format_event(name, data, event_id=None):
+        lines = [f'event: {name}']
+        if event_id is not None:
+            lines.append(f'id: {event_id}')
+        lines.append('data: ' + json.dumps(data, ensure_ascii=False))
+        return ('\n'.join(lines) + '\n\n').encode('utf-8')
     
     def get_html(self):
         """HTML 페이지 생성"""
@@ -487,11 +447,49 @@ class WebGUIHandler(BaseHTTPRequestHandler):
             display: block;
         }
         
+        label.checkbox {
+            display: flex;
+            align-items: center;
+            gap: 8px;
+            font-weight: normal;
+            cursor: pointer;
+        }
+        
         .hint {
             font-size: 12px;
             color: #999;
             margin-top: 5px;
         }
+        
+        .progress {
+            display: none;
+            margin-top: 20px;
+        }
+        
+        .progress.active {
+            display: block;
+        }
+        
+        .progress-track {
+            height: 10px;
+            background: #e0e0e0;
+            border-radius: 5px;
+            overflow: hidden;
+        }
+        
+        .progress-bar {
+            height: 100%;
+            width: 0;
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            transition: width 0.2s;
+        }
+        
+        .progress-text {
+            margin-top: 8px;
+            font-size: 13px;
+            color: #667eea;
+            text-align: center;
+        }
     </style>
 </head>
 <body>
@@ -516,6 +514,14 @@ class WebGUIHandler(BaseHTTPRequestHandler):
                 <div class="hint">비워두면 현재 폴더의 'converted_notes'에 저장됩니다</div>
             </div>
             
+            <div class="form-group">
+                <label class="checkbox">
+                    <input type="checkbox" id="resume" name="resume" value="1">
+                    ♻️ 중단된 변환 이어서 하기
+                </label>
+                <div class="hint">같은 출력 폴더로 중단되었던 변환을 완료된 항목부터 이어서 진행합니다</div>
+            </div>
+            
             <button type="submit" class="btn" id="convertBtn">
                 🔄 변환 시작
             </button>
@@ -526,6 +532,11 @@ class WebGUIHandler(BaseHTTPRequestHandler):
             <p style="margin-top: 10px; color: #667eea;">변환 중...</p>
         </div>
         
+        <div class="progress" id="progress">
+            <div class="progress-track"><div class="progress-bar" id="progressBar"></div></div>
+            <div class="progress-text" id="progressText"></div>
+        </div>
+        
         <div class="log-container" id="logContainer"></div>
     </div>
     
@@ -535,12 +546,92 @@ class WebGUIHandler(BaseHTTPRequestHandler):
         const logContainer = document.getElementById('logContainer');
         const alert = document.getElementById('alert');
         const convertBtn = document.getElementById('convertBtn');
+        const progress = document.getElementById('progress');
+        const progressBar = document.getElementById('progressBar');
+        const progressText = document.getElementById('progressText');
+        
+        const phaseLabels = {
+            index: '📊 노트 분석',
+            images: '🖼️ 이미지',
+            notes: '📝 노트',
+        };
+        
+        function formatBytes(bytes) {
+            if (bytes >= 1024 * 1024) {
+                return `${(bytes / (1024 * 1024)).toFixed(1)} MB`;
+            }
+            return `${(bytes / 1024).toFixed(1)} KB`;
+        }
+        
+        function formatEta(seconds) {
+            if (seconds === null || seconds === undefined) {
+                return '계산 중';
+            }
+            seconds = Math.round(seconds);
+            if (seconds >= 60) {
+                return `약 ${Math.floor(seconds / 60)}분 ${seconds % 60}초`;
+            }
+            return `약 ${seconds}초`;
+        }
+        
+        function showProgress(data) {
+            const percent = data.total ? (data.done / data.total) * 100 : 100;
+            progressBar.style.width = `${percent}%`;
+            progressText.textContent =
+                `${phaseLabels[data.phase] || data.phase} ${data.done}/${data.total} · ` +
+                `${formatBytes(data.bytes_written)} 기록 · 남은 시간 ${formatEta(data.eta)}`;
+        }
+        
+        function finish() {
+            spinner.classList.remove('active');
+            convertBtn.disabled = false;
+        }
+        
+        function watchJob(jobId) {
+            const source = new EventSource(`/jobs/${jobId}/events`);
+            
+            source.addEventListener('log', (e) => {
+                const data = JSON.parse(e.data);
+                logContainer.textContent += data.lines.join('\n') + '\n';
+                logContainer.scrollTop = logContainer.scrollHeight;
+            });
+            
+            source.addEventListener('progress', (e) => {
+                showProgress(JSON.parse(e.data));
+            });
+            
+            source.addEventListener('done', (e) => {
+                const result = JSON.parse(e.data);
+                source.close();
+                
+                // 결과 알림
+                if (result.success) {
+                    progressBar.style.width = '100%';
+                    alert.className = 'alert success active';
+                    alert.textContent = `✅ 변환 완료! ${result.note_count}개의 노트가 변환되었습니다.`;
+                } else {
+                    alert.className = 'alert error active';
+                    alert.textContent = '❌ 변환에 실패했습니다. 로그를 확인하세요.';
+                }
+                finish();
+            });
+            
+            // 연결이 끊기면 EventSource가 Last-Event-ID와 함께 자동으로 재연결
+            source.onerror = () => {
+                if (source.readyState === EventSource.CLOSED) {
+                    alert.className = 'alert error active';
+                    alert.textContent = '❌ 서버와의 연결이 끊어졌습니다.';
+                    finish();
+                }
+            };
+        }
         
         form.addEventListener('submit', async (e) => {
             e.preventDefault();
             
             const nsx_path = document.getElementById('nsx_path').value.trim();
             let output_path = document.getElementById('output_path').value.trim();
+            const resume = document.getElementById('resume').checked ? '1' : '';
             
             if (!output_path) {
                 output_path = 'converted_notes';
@@ -549,8 +640,11 @@ class WebGUIHandler(BaseHTTPRequestHandler):
             // UI 업데이트
             convertBtn.disabled = true;
             spinner.classList.add('active');
+            progress.classList.add('active');
+            progressBar.style.width = '0';
+            progressText.textContent = '';
             logContainer.classList.add('active');
-            logContainer.textContent = '변환을 시작합니다...\\n';
+            logContainer.textContent = '';
             alert.classList.remove('active');
             
             try {
@@ -559,30 +653,17 @@ class WebGUIHandler(BaseHTTPRequestHandler):
                     headers: {
                         'Content-Type': 'application/x-www-form-urlencoded',
                     },
-                    body: `nsx_path=${encodeURIComponent(nsx_path)}&output_path=${encodeURIComponent(output_path)}`
+                    body: `nsx_path=${encodeURIComponent(nsx_path)}&output_path=${encodeURIComponent(output_path)}&resume=${resume}`
                 });
                 
-                const result = await response.json();
-                
-                // 로그 표시
-                logContainer.textContent = result.logs;
-                
-                // 결과 알림
-                if (result.success) {
-                    alert.className = 'alert success active';
-                    alert.textContent = `✅ 변환 완료! ${result.note_count}개의 노트가 변환되었습니다.`;
-                } else {
-                    alert.className = 'alert error active';
-                    alert.textContent = '❌ 변환에 실패했습니다. 로그를 확인하세요.';
-                }
+                const job = await response.json();
+                watchJob(job.job_id);
                 
             } catch (error) {
                 alert.className = 'alert error active';
                 alert.textContent = `❌ 오류 발생: ${error.message}`;
-                logContainer.textContent += `\\n오류: ${error.message}`;
-            } finally {
-                spinner.classList.remove('active');
-                convertBtn.disabled = false;
+                logContainer.textContent += `\n오류: ${error.message}`;
+                finish();
             }
         });
     </script>